@@ -0,0 +1,31 @@
+"""
+Article record shared by Feeder, SocialFeeder and the pulse.
+
+Title and summary are stored once; the LLM-facing text is built on demand
+instead of being kept as a second copy of both. Summaries are truncated here,
+at ingestion, so every feed type feeds the same amount of text downstream.
+"""
+
+SUMMARY_CHARS = 500
+
+
+class Article:
+    __slots__ = ("source", "title", "summary", "link", "hash", "type")
+
+    def __init__(self, source, title, summary, link, hash, type="rss"):
+        self.source = source
+        self.title = title
+        self.summary = (summary or "")[:SUMMARY_CHARS]
+        self.link = link
+        self.hash = hash
+        self.type = type
+
+    @property
+    def text(self):
+        # X posts keep the handle in front so the analyst knows who said it
+        if self.type == "twitter":
+            return f"{self.source}: {self.title}\n{self.summary}"
+        return f"{self.title}\n{self.summary}"
+
+    def __repr__(self):
+        return f"Article({self.source!r}, {self.title!r})"
@@ -1,8 +1,8 @@
 import streamlit as st
-import json
-import sqlite3
 import pandas as pd
 from datetime import datetime
+from database import Database
+from source_registry import SourceRegistry
 
 # Page config
 st.set_page_config(page_title="Daily Brief Dashboard", page_icon="🕵️", layout="wide")
@@ -11,17 +11,36 @@ st.set_page_config(page_title="Daily Brief Dashboard", page_icon="🕵️", layo
 DB_PATH = "/root/daily_brief/data/briefs.db"
 SOURCES_PATH = "/root/daily_brief/sources.json"
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    return conn
+# Stream cache lifetime; a new mention (max id change) invalidates it sooner
+STREAM_CACHE_TTL = 300
+PAGE_SIZE = 50
+RUNS_SHOWN = 50
+
+@st.cache_resource
+def get_db():
+    # One shared WAL connection for every session/rerun of this server process
+    return Database(DB_PATH)
+
+@st.cache_data(ttl=STREAM_CACHE_TTL, show_spinner=False)
+def load_page(version, before, sources, start, end, tag, limit=PAGE_SIZE):
+    # `version` is max(mentions.id): part of the cache key, so new intel busts the cache
+    rows = get_db().query_mentions(limit=limit, before=before, sources=list(sources), start=start, end=end, tag=tag)
+    return pd.DataFrame(rows, columns=["id", "timestamp", "source", "analysis_toon_phrase", "url"])
+
+@st.cache_data(ttl=STREAM_CACHE_TTL, show_spinner=False)
+def load_source_names(version):
+    return get_db().get_sources()
+
+@st.cache_data(ttl=STREAM_CACHE_TTL, show_spinner=False)
+def load_pulse_runs(limit=RUNS_SHOWN):
+    return get_db().get_pulse_runs(limit)
 
 def load_sources():
-    with open(SOURCES_PATH, 'r') as f:
-        return json.load(f)
+    return SourceRegistry.get(SOURCES_PATH).load()
 
-def save_sources(sources):
-    with open(SOURCES_PATH, 'w') as f:
-        json.dump(sources, f, indent=2)
+def update_sources(mutate):
+    # Locked read-modify-write with an atomic file swap; the pulse never sees a partial file
+    return SourceRegistry.get(SOURCES_PATH).update(mutate)
 
 st.title("🕵️ Daily Brief Intelligence Center")
 
@@ -35,8 +54,7 @@ with st.sidebar.expander("➕ Add RSS Source"):
     new_url = st.text_input("RSS URL")
     if st.button("Add"):
         if new_name and new_url:
-            sources['rss'].append({"name": new_name, "url": new_url})
-            save_sources(sources)
+            update_sources(lambda s: s.setdefault('rss', []).append({"name": new_name, "url": new_url}))
             st.success(f"Added {new_name}")
             st.rerun()
 
@@ -46,27 +64,87 @@ for i, source in enumerate(sources.get('rss', [])):
     col1, col2 = st.sidebar.columns([4, 1])
     col1.text(source['name'])
     if col2.button("❌", key=f"del_{i}"):
-        sources['rss'].pop(i)
-        save_sources(sources)
+        def remove_source(current, removed=source):
+            # Remove by value, not index: the file may have changed since this render
+            current['rss'] = [r for r in current.get('rss', []) if r != removed]
+        update_sources(remove_source)
         st.success("Removed source")
         st.rerun()
 
 # Main Area - Intel Stream
 st.header("📈 Intelligence Stream")
 
-conn = get_db_connection()
-query = "SELECT timestamp, source, analysis_toon_phrase FROM mentions ORDER BY timestamp DESC LIMIT 50"
-df = pd.read_sql_query(query, conn)
-conn.close()
+version = get_db().get_max_mention_id()
+
+# Filters
+col_src, col_dates, col_tag = st.columns([3, 2, 1])
+selected_sources = col_src.multiselect("Sources", load_source_names(version))
+date_range = col_dates.date_input("Date range", value=())
+selected_tag = col_tag.selectbox("Tag", ["All"] + list(Database.ANALYSIS_TAGS))
+
+start = end = None
+if len(date_range) == 2:
+    start, end = (d.strftime('%Y-%m-%d') for d in date_range)
+elif len(date_range) == 1:
+    start = end = date_range[0].strftime('%Y-%m-%d')
+filters = (tuple(selected_sources), start, end, None if selected_tag == "All" else selected_tag)
+
+# Keyset pagination: a stack of (timestamp, id) cursors, reset whenever filters change
+if st.session_state.get("stream_filters") != filters:
+    st.session_state.stream_filters = filters
+    st.session_state.stream_cursors = [None]
+cursors = st.session_state.stream_cursors
+
+df = load_page(version, cursors[-1], *filters)
 
 if not df.empty:
-    for _, row in df.iterrows():
-        with st.container():
-            st.markdown(f"**[{row['timestamp']}] {row['source']}**")
-            st.info(row['analysis_toon_phrase'])
-            st.divider()
+    # Build every card as one markdown block instead of a widget per row
+    cards = (
+        "**[" + df["timestamp"].astype(str) + "] " + df["source"].fillna("") + "**\n\n> "
+        + df["analysis_toon_phrase"].fillna("").str.replace("\n", "\n> ", regex=False)
+    )
+    st.markdown("\n\n---\n\n".join(cards))
 else:
     st.write("No intelligence reports found yet.")
 
+col_newer, col_page, col_older = st.columns([1, 2, 1])
+if col_newer.button("⬅ Newer", disabled=len(cursors) == 1):
+    cursors.pop()
+    st.rerun()
+col_page.caption(f"Page {len(cursors)}")
+if col_older.button("Older ➡", disabled=len(df) < PAGE_SIZE):
+    last = df.iloc[-1]
+    cursors.append((last["timestamp"], int(last["id"])))
+    st.rerun()
+
+# Pipeline run metrics (recorded by metrics.py)
+st.header("⏱ Pipeline Runs")
+runs = load_pulse_runs()
+if runs:
+    last = runs[0]
+    col_dur, col_calls, col_p95, col_tokens = st.columns(4)
+    col_dur.metric("Last run", f"{last['duration']:.0f}s")
+    col_calls.metric("LLM calls", last["llm_calls"], help=f"{last['llm_cached_calls']} served from cache")
+    col_p95.metric("LLM p95 latency", f"{last['llm_latency_p95'] or 0:.1f}s")
+    col_tokens.metric("Tokens", f"{last['total_tokens']:,}")
+
+    runs_df = pd.DataFrame(runs)
+    st.dataframe(
+        runs_df[["started_at", "kind", "duration", "llm_calls", "llm_latency_p50", "llm_latency_p95", "prompt_tokens", "completion_tokens", "total_tokens"]],
+        hide_index=True, use_container_width=True
+    )
+    st.caption(f"Token spend over the last {len(runs)} runs: {int(runs_df['total_tokens'].sum()):,}")
+
+    with st.expander("Stage timings (last run)"):
+        # Concurrent stages (fetches, relevance, analysis) are summed, so they can exceed the run duration
+        stages = pd.DataFrame(
+            [(name, s["seconds"], s["calls"]) for name, s in last["stages"].items()],
+            columns=["stage", "seconds", "calls"]
+        ).sort_values("seconds", ascending=False)
+        st.dataframe(stages, hide_index=True, use_container_width=True)
+        st.json(last["counts"])
+else:
+    st.write("No pipeline runs recorded yet.")
+
 # Footer
 st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
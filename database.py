@@ -1,61 +1,271 @@
 import sqlite3
 import hashlib
+import json
+import re
+import threading
+import time
 from datetime import datetime, timedelta
+from dedupe_cache import DedupeCache
 
 class Database:
+    # One long-lived connection per database file per process. Every Database()
+    # (Feeder, SocialFeeder, pipeline, publish) shares it, so the per-article
+    # dedupe lookups stop paying connect/close costs and init_db runs once.
+    _connections = {}
+    _locks = {}
+    _dedupe_caches = {}
+    _registry_lock = threading.Lock()
+    HASH_CHUNK_SIZE = 500
+
+    # Schema migrations, applied in order and tracked via PRAGMA user_version.
+    # Never edit a shipped entry; append a new one instead.
+    MIGRATIONS = [
+        # 1: baseline schema
+        [
+            """
+            CREATE TABLE IF NOT EXISTS mentions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                source TEXT,
+                raw_text TEXT,
+                analysis_toon_phrase TEXT,
+                url TEXT,
+                hash TEXT UNIQUE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS daily_wraps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT UNIQUE,
+                wrap_text TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS feed_state (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+        # 2: time-range indexes for dedupe, recent context and per-day queries
+        [
+            "CREATE INDEX IF NOT EXISTS idx_mentions_timestamp ON mentions (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_mentions_hash_timestamp ON mentions (hash, timestamp)",
+        ],
+        # 3: content-addressed LLM response cache
+        [
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT,
+                created_at REAL,
+                last_used REAL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache (created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)",
+        ],
+        # 4: Arabic translation stored alongside each wrap, keyed by wrap hash
+        [
+            "ALTER TABLE daily_wraps ADD COLUMN wrap_hash TEXT",
+            "ALTER TABLE daily_wraps ADD COLUMN wrap_ar TEXT",
+        ],
+        # 5: rendered Intelligence Stream card per mention, for incremental publish
+        [
+            """
+            CREATE TABLE IF NOT EXISTS mention_fragments (
+                mention_id INTEGER PRIMARY KEY,
+                content_hash TEXT,
+                html TEXT
+            )
+            """,
+        ],
+        # 6: small key/value store for pipeline state (publish fingerprint etc.)
+        [
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """,
+        ],
+        # 7: dashboard filters - per-mention analysis tags and source lookups
+        [
+            """
+            CREATE TABLE IF NOT EXISTS mention_tags (
+                tag TEXT,
+                mention_id INTEGER,
+                PRIMARY KEY (tag, mention_id)
+            ) WITHOUT ROWID
+            """,
+            "INSERT OR IGNORE INTO mention_tags (tag, mention_id) SELECT 'FACT', id FROM mentions WHERE analysis_toon_phrase LIKE '%[FACT]%'",
+            "INSERT OR IGNORE INTO mention_tags (tag, mention_id) SELECT 'IMPLICATION', id FROM mentions WHERE analysis_toon_phrase LIKE '%[IMPLICATION]%'",
+            "INSERT OR IGNORE INTO mention_tags (tag, mention_id) SELECT 'SIGNAL', id FROM mentions WHERE analysis_toon_phrase LIKE '%[SIGNAL]%'",
+            "CREATE INDEX IF NOT EXISTS idx_mentions_source_timestamp ON mentions (source, timestamp)",
+        ],
+        # 8: Nitter instance health for SocialFeeder
+        [
+            """
+            CREATE TABLE IF NOT EXISTS nitter_health (
+                instance TEXT PRIMARY KEY,
+                successes INTEGER DEFAULT 0,
+                failures INTEGER DEFAULT 0,
+                consecutive_failures INTEGER DEFAULT 0,
+                avg_latency REAL,
+                last_success REAL,
+                last_failure REAL,
+                backoff_until REAL DEFAULT 0
+            )
+            """,
+        ],
+        # 9: per-run timing and token usage (metrics.py)
+        [
+            """
+            CREATE TABLE IF NOT EXISTS pulse_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT,
+                started_at DATETIME,
+                duration REAL,
+                llm_calls INTEGER,
+                llm_cached_calls INTEGER,
+                llm_latency_p50 REAL,
+                llm_latency_p95 REAL,
+                llm_latency_max REAL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                total_tokens INTEGER,
+                stages TEXT,
+                counts TEXT
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_pulse_runs_started_at ON pulse_runs (started_at)",
+        ],
+    ]
+
+    # Analysis tags indexed into mention_tags for the dashboard filter
+    ANALYSIS_TAGS = ("FACT", "IMPLICATION", "SIGNAL")
+    _TAG_PATTERN = re.compile(r"\[(FACT|IMPLICATION|SIGNAL)\]", re.IGNORECASE)
+
     def __init__(self, db_path="/root/daily_brief/data/briefs.db"):
         self.db_path = db_path
-        self.init_db()
+        with Database._registry_lock:
+            created = db_path not in Database._connections
+            if created:
+                Database._connections[db_path] = self._connect(db_path)
+                Database._locks[db_path] = threading.RLock()
+                Database._dedupe_caches[db_path] = DedupeCache()
+        self.conn = Database._connections[db_path]
+        # Feeds are fetched from worker threads; serialize access to the shared connection
+        self.lock = Database._locks[db_path]
+        self.dedupe_cache = Database._dedupe_caches[db_path]
+        if created:
+            self.init_db()
+
+    @staticmethod
+    def _connect(db_path):
+        # cached_statements keeps the compiled form of every query below around
+        # for the life of the process, so repeated lookups skip re-preparing.
+        conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-8000")  # ~8MB page cache, sized for the 1GB VPS
+        conn.execute("PRAGMA mmap_size=67108864")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @classmethod
+    def close_all(cls):
+        with cls._registry_lock:
+            for conn in cls._connections.values():
+                conn.close()
+            cls._connections.clear()
+            cls._locks.clear()
+            cls._dedupe_caches.clear()
 
     def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS mentions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    source TEXT,
-                    raw_text TEXT,
-                    analysis_toon_phrase TEXT,
-                    url TEXT,
-                    hash TEXT UNIQUE
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_wraps (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT UNIQUE,
-                    wrap_text TEXT
-                )
-            """)
-            conn.commit()
+        with self.lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, statements in enumerate(self.MIGRATIONS[version:], start=version + 1):
+                with self.conn:
+                    for statement in statements:
+                        self.conn.execute(statement)
+                    # PRAGMA can't take bound parameters; target is always an int
+                    self.conn.execute(f"PRAGMA user_version = {target}")
 
     def add_mention(self, source, raw_text, analysis, title_hash, url=None):
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self.lock, self.conn:
+                cursor = self.conn.execute(
                     "INSERT INTO mentions (source, raw_text, analysis_toon_phrase, hash, url) VALUES (?, ?, ?, ?, ?)",
                     (source, raw_text, analysis, title_hash, url)
                 )
-                conn.commit()
+                tags = {tag.upper() for tag in self._TAG_PATTERN.findall(analysis or "")}
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO mention_tags (tag, mention_id) VALUES (?, ?)",
+                    [(tag, cursor.lastrowid) for tag in tags]
+                )
+                self.dedupe_cache.add(title_hash)
                 return True
         except sqlite3.IntegrityError:
             # Hash already exists
             return False
 
+    def _warm_dedupe_cache(self, since):
+        # Caller holds self.lock
+        cursor = self.conn.execute("SELECT hash FROM mentions WHERE timestamp > ?", (since,))
+        self.dedupe_cache.warm(row[0] for row in cursor)
+
     def is_duplicate(self, title_hash):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Check if hash exists in the last 24 hours
-            yesterday = (datetime.now() - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute("SELECT 1 FROM mentions WHERE hash = ? AND timestamp > ?", (title_hash, yesterday))
-            return cursor.fetchone() is not None
+        # Check if hash exists in the last 24 hours
+        yesterday = (datetime.now() - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            if self.dedupe_cache.is_stale():
+                self._warm_dedupe_cache(yesterday)
+            if not self.dedupe_cache.might_contain(title_hash):
+                self.dedupe_cache.hits += 1
+                return False
+            self.dedupe_cache.misses += 1
+            cursor = self.conn.execute("SELECT 1 FROM mentions WHERE hash = ? AND timestamp > ?", (title_hash, yesterday))
+            found = cursor.fetchone() is not None
+            if not found:
+                self.dedupe_cache.false_positives += 1
+            return found
+
+    def filter_new_hashes(self, hashes):
+        """
+        Bulk counterpart of is_duplicate: returns the subset of `hashes` not
+        seen in the last 24 hours, resolved in as few queries as possible.
+        Hashes the dedupe cache rules out never reach SQLite.
+        """
+        candidates = set(hashes)
+        if not candidates:
+            return set()
+        yesterday = (datetime.now() - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+        seen = set()
+        with self.lock:
+            if self.dedupe_cache.is_stale():
+                self._warm_dedupe_cache(yesterday)
+            maybe_seen = [h for h in candidates if self.dedupe_cache.might_contain(h)]
+            self.dedupe_cache.hits += len(candidates) - len(maybe_seen)
+            self.dedupe_cache.misses += len(maybe_seen)
+            # Stay well under SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds
+            for i in range(0, len(maybe_seen), self.HASH_CHUNK_SIZE):
+                chunk = maybe_seen[i:i + self.HASH_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self.conn.execute(
+                    f"SELECT hash FROM mentions WHERE hash IN ({placeholders}) AND timestamp > ?",
+                    (*chunk, yesterday)
+                )
+                seen.update(row[0] for row in cursor.fetchall())
+            self.dedupe_cache.false_positives += len(maybe_seen) - len(seen)
+        return candidates - seen
 
     def get_recent_toon_phrases(self, limit=5):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+        with self.lock:
+            cursor = self.conn.execute(
                 "SELECT analysis_toon_phrase, url FROM mentions ORDER BY timestamp DESC LIMIT ?",
                 (limit,)
             )
@@ -63,22 +273,316 @@ class Database:
 
     def get_daily_phrases(self, date_str):
         # date_str in 'YYYY-MM-DD' format
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT analysis_toon_phrase, url FROM mentions WHERE date(timestamp) = ?",
-                (date_str,)
+        start, end = self.day_bounds(date_str)
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT analysis_toon_phrase, url FROM mentions WHERE timestamp >= ? AND timestamp < ?",
+                (start, end)
             )
             return [f"{row[0]} [Source: {row[1]}]" if row[1] else row[0] for row in cursor.fetchall()]
 
-    def save_daily_wrap(self, date_str, wrap_text):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO daily_wraps (date, wrap_text) VALUES (?, ?)",
-                (date_str, wrap_text)
+    def save_daily_wrap(self, date_str, wrap_text, wrap_ar=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO daily_wraps (date, wrap_text, wrap_hash, wrap_ar) VALUES (?, ?, ?, ?)",
+                (date_str, wrap_text, self.generate_hash(wrap_text), wrap_ar)
+            )
+
+    def save_wrap_translation(self, date_str, wrap_hash, wrap_ar):
+        # Only attach the translation if the wrap hasn't been replaced meanwhile
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE daily_wraps SET wrap_ar = ? WHERE date = ? AND wrap_hash = ?",
+                (wrap_ar, date_str, wrap_hash)
+            )
+
+    def _wrap_from_row(self, row):
+        if row is None:
+            return None
+        date_str, wrap_text, wrap_hash, wrap_ar = row
+        # Wraps saved before migration 4 have no hash yet
+        return {
+            "date": date_str,
+            "wrap_text": wrap_text,
+            "wrap_hash": wrap_hash or self.generate_hash(wrap_text),
+            "wrap_ar": wrap_ar,
+        }
+
+    def get_latest_wrap(self):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT date, wrap_text, wrap_hash, wrap_ar FROM daily_wraps ORDER BY date DESC LIMIT 1"
+            ).fetchone()
+        return self._wrap_from_row(row)
+
+    def get_wrap(self, date_str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT date, wrap_text, wrap_hash, wrap_ar FROM daily_wraps WHERE date = ?",
+                (date_str,)
+            ).fetchone()
+        return self._wrap_from_row(row)
+
+    def get_wrap_summaries(self):
+        # (date, wrap_hash, has_translation) for every wrap, newest first, without loading the texts
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT date, wrap_hash, wrap_ar IS NOT NULL, CASE WHEN wrap_hash IS NULL THEN wrap_text END FROM daily_wraps ORDER BY date DESC"
+            ).fetchall()
+        return [
+            (date_str, wrap_hash or self.generate_hash(wrap_text), bool(has_ar))
+            for date_str, wrap_hash, has_ar, wrap_text in rows
+        ]
+
+    def get_day_mentions(self, date_str):
+        # (id, source, analysis, url, timestamp) rows for one day, newest first
+        start, end = self.day_bounds(date_str)
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT id, source, analysis_toon_phrase, url, timestamp FROM mentions WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp DESC",
+                (start, end)
+            )
+            return cursor.fetchall()
+
+    def get_feed_state(self, url):
+        # HTTP validators from the last successful fetch of a feed, or None
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT etag, last_modified, content_hash FROM feed_state WHERE url = ?",
+                (url,)
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_hash": row[2]}
+
+    def save_feed_state(self, url, etag, last_modified, content_hash):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO feed_state (url, etag, last_modified, content_hash, checked_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                (url, etag, last_modified, content_hash)
             )
-            conn.commit()
+
+    def get_max_mention_id(self):
+        # Cheap change marker for caches of the mentions table (O(1) on the rowid)
+        with self.lock:
+            return self.conn.execute("SELECT MAX(id) FROM mentions").fetchone()[0] or 0
+
+    def query_mentions(self, limit=50, before=None, sources=None, start=None, end=None, tag=None):
+        """
+        One page of the Intelligence Stream, newest first, for the dashboard.
+
+        Keyset pagination: `before` is the (timestamp, id) of the last row of
+        the previous page, so every page is an index range scan no matter how
+        deep the analyst scrolls. start/end are 'YYYY-MM-DD' (end inclusive),
+        sources a list of source names, tag one of ANALYSIS_TAGS.
+        Returns (id, timestamp, source, analysis, url) rows.
+        """
+        clauses = []
+        params = []
+        if before is not None:
+            # The leading `timestamp <= ?` bounds the index range; the OR only trims ties
+            clauses.append("timestamp <= ? AND (timestamp < ? OR id < ?)")
+            params += [before[0], before[0], before[1]]
+        if sources:
+            clauses.append(f"source IN ({','.join('?' * len(sources))})")
+            params += list(sources)
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(self.day_bounds(start)[0])
+        if end:
+            clauses.append("timestamp < ?")
+            params.append(self.day_bounds(end)[1])
+        if tag:
+            # Correlated lookup on the (tag, mention_id) key keeps the timestamp-ordered scan
+            clauses.append("EXISTS (SELECT 1 FROM mention_tags WHERE tag = ? AND mention_id = mentions.id)")
+            params.append(tag)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT id, timestamp, source, analysis_toon_phrase, url FROM mentions {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (*params, limit)
+            )
+            return cursor.fetchall()
+
+    def get_sources(self):
+        # Distinct mention sources (walks idx_mentions_source_timestamp)
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT source FROM mentions ORDER BY source") if row[0]]
+
+    def get_mentions_after(self, last_id, limit):
+        # (id, timestamp, source, analysis, url) rows with id > last_id, oldest first
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT id, timestamp, source, analysis_toon_phrase, url FROM mentions WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit)
+            )
+            return cursor.fetchall()
+
+    def get_nitter_health(self):
+        # {instance: {successes, failures, avg_latency, backoff_until, ...}}
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT instance, successes, failures, consecutive_failures, avg_latency, last_success, last_failure, backoff_until FROM nitter_health"
+            )
+            columns = [c[0] for c in cursor.description]
+            return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    def record_nitter_result(self, instance, ok, latency, backoff_base=300, backoff_max=6 * 3600):
+        """
+        Update an instance's health after one probe. Latency is an exponential
+        moving average over successes; each consecutive failure doubles the
+        backoff window (backoff_base seconds, capped at backoff_max).
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT consecutive_failures, avg_latency FROM nitter_health WHERE instance = ?",
+                (instance,)
+            ).fetchone()
+            consecutive, avg_latency = row if row else (0, None)
+            if ok:
+                avg_latency = latency if avg_latency is None else 0.7 * avg_latency + 0.3 * latency
+                self.conn.execute(
+                    "INSERT INTO nitter_health (instance, successes, avg_latency, last_success, consecutive_failures, backoff_until) VALUES (?, 1, ?, ?, 0, 0) "
+                    "ON CONFLICT(instance) DO UPDATE SET successes = successes + 1, avg_latency = excluded.avg_latency, "
+                    "last_success = excluded.last_success, consecutive_failures = 0, backoff_until = 0",
+                    (instance, avg_latency, now)
+                )
+            else:
+                consecutive += 1
+                backoff_until = now + min(backoff_base * 2 ** (consecutive - 1), backoff_max)
+                self.conn.execute(
+                    "INSERT INTO nitter_health (instance, failures, last_failure, consecutive_failures, backoff_until) VALUES (?, 1, ?, ?, ?) "
+                    "ON CONFLICT(instance) DO UPDATE SET failures = failures + 1, last_failure = excluded.last_failure, "
+                    "consecutive_failures = excluded.consecutive_failures, backoff_until = excluded.backoff_until",
+                    (instance, now, consecutive, backoff_until)
+                )
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_meta_items(self, prefix):
+        # {key: value} for every meta key starting with prefix (range scan on the primary key)
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT key, value FROM meta WHERE key >= ? AND key < ?",
+                (prefix, prefix + "\uffff")
+            )
+            return dict(cursor.fetchall())
+
+    def save_pulse_run(self, summary):
+        # summary as built by metrics.RunMetrics.summary(); stages/counts stored as JSON
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO pulse_runs (kind, started_at, duration, llm_calls, llm_cached_calls, llm_latency_p50, llm_latency_p95, llm_latency_max, "
+                "prompt_tokens, completion_tokens, total_tokens, stages, counts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (summary["kind"], summary["started_at"], summary["duration"], summary["llm_calls"], summary["llm_cached_calls"],
+                 summary["llm_latency_p50"], summary["llm_latency_p95"], summary["llm_latency_max"],
+                 summary["prompt_tokens"], summary["completion_tokens"], summary["total_tokens"],
+                 json.dumps(summary["stages"]), json.dumps(summary["counts"]))
+            )
+
+    def get_pulse_runs(self, limit=50):
+        # Most recent runs first, stages/counts decoded
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM pulse_runs ORDER BY started_at DESC, id DESC LIMIT ?", (limit,)
+            )
+            columns = [c[0] for c in cursor.description]
+            runs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for run in runs:
+            run["stages"] = json.loads(run["stages"] or "{}")
+            run["counts"] = json.loads(run["counts"] or "{}")
+        return runs
+
+    def get_mention_fragments(self, mention_ids):
+        # {mention_id: (content_hash, html)} for the cached subset of mention_ids
+        fragments = {}
+        ids = list(mention_ids)
+        with self.lock:
+            for i in range(0, len(ids), self.HASH_CHUNK_SIZE):
+                chunk = ids[i:i + self.HASH_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self.conn.execute(
+                    f"SELECT mention_id, content_hash, html FROM mention_fragments WHERE mention_id IN ({placeholders})",
+                    chunk
+                )
+                for mention_id, content_hash, html in cursor:
+                    fragments[mention_id] = (content_hash, html)
+        return fragments
+
+    def save_mention_fragments(self, fragments):
+        # fragments: iterable of (mention_id, content_hash, html)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO mention_fragments (mention_id, content_hash, html) VALUES (?, ?, ?)",
+                fragments
+            )
+
+    def prune_mention_fragments(self, keep_from):
+        """
+        Drop cached fragments of mentions before the 'YYYY-MM-DD' day keep_from.
+        Ids grow with time, so this is a primary-key range delete.
+        """
+        start = self.day_bounds(keep_from)[0]
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM mention_fragments WHERE mention_id < COALESCE("
+                "(SELECT MIN(id) FROM mentions WHERE timestamp >= ?), (SELECT MAX(id) + 1 FROM mentions), 0)",
+                (start,)
+            )
+            return cursor.rowcount
+
+    def get_llm_cache(self, key, ttl):
+        # Cached response body for `key` if younger than ttl seconds, else None
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put_llm_cache(self, key, response):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+
+    def delete_llm_cache(self, key):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def evict_llm_cache(self, ttl, max_entries):
+        # Drop expired entries, then the least recently used beyond max_entries
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - ttl,))
+            self.conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            )
+
+    @staticmethod
+    def day_bounds(date_str):
+        """
+        Half-open [start, end) timestamp range covering one 'YYYY-MM-DD' day.
+        Comparing the raw timestamp column (instead of date(timestamp)) lets
+        SQLite use idx_mentions_timestamp.
+        """
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+        return day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')
 
     @staticmethod
     def generate_hash(text):
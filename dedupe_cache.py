@@ -0,0 +1,67 @@
+"""
+In-memory Bloom filter sitting in front of the mentions dedupe lookups.
+
+The filter is warmed with every hash seen in the last 24 hours and updated on
+each insert, so a "not present" answer is definitive and never touches SQLite.
+Only "maybe present" answers fall through to the database.
+"""
+
+import hashlib
+import math
+import time
+
+
+class DedupeCache:
+    def __init__(self, capacity=50000, error_rate=0.01, max_age=6 * 3600):
+        # Standard Bloom sizing: m bits and k hash functions for n items at rate p
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        # Entries older than 24h linger until the next warm; rebuild periodically
+        # so a long-running process doesn't drift towards all-positive answers.
+        self.max_age = max_age
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.warmed_at = None
+
+        # Counters for sizing against the memory budget
+        self.hits = 0             # definite negatives answered from memory
+        self.misses = 0           # lookups that had to go to SQLite
+        self.false_positives = 0  # misses where SQLite found nothing
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def warm(self, keys):
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+        for key in keys:
+            self.add(key)
+        self.warmed_at = time.monotonic()
+
+    def is_stale(self):
+        return self.warmed_at is None or time.monotonic() - self.warmed_at > self.max_age
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.count,
+            "capacity": self.capacity,
+            "memory_bytes": len(self.bits),
+            "hits": self.hits,
+            "misses": self.misses,
+            "false_positives": self.false_positives,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,42 +1,114 @@
 import feedparser
-import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from article import Article
 from database import Database
+from source_registry import SourceRegistry
+from http_util import conditional_get, save_feed_state
+import metrics
 
 class Feeder:
-    def __init__(self, sources_path="/root/daily_brief/sources.json"):
+    def __init__(self, sources_path="/root/daily_brief/sources.json", max_workers=8, per_host_limit=2, timeout=15, sources=None):
         self.sources_path = sources_path
+        self.registry = SourceRegistry.get(sources_path)
+        self.sources = sources
         self.db = Database()
+        self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        # Concurrency knobs: total parallel downloads, parallel downloads per host
+        # (several feeds share a domain) and a hard per-feed timeout in seconds.
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._host_locks = {}
+        self._host_locks_guard = threading.Lock()
+        # source name -> feed validators, saved by commit_feed_state() once processed
+        self.pending_feed_state = {}
 
     def load_sources(self):
-        with open(self.sources_path, 'r') as f:
-            return json.load(f)
+        # A pinned per-pulse snapshot if given, else the registry's cached copy
+        if self.sources is not None:
+            return self.sources
+        return self.registry.load()
 
-    def fetch_rss(self):
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._host_locks_guard:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_locks[host]
+
+    def _download_feed(self, source):
+        """
+        Download one feed body. Runs in a worker thread; returns None on failure
+        or when the feed is unchanged since the last pulse, so a single dead
+        feed never takes the rest of the pulse down with it.
+        """
+        url = source['url']
+        try:
+            with self._host_semaphore(url), metrics.timed(f"fetch:{source['name']}"):
+                status, body, new_state = conditional_get(self.db, url, headers={'User-Agent': self.user_agent}, timeout=self.timeout)
+            if status not in (200, 304):
+                print(f"Error fetching {source['name']}: HTTP {status}")
+            if new_state:
+                self.pending_feed_state[source['name']] = new_state
+            return body
+        except Exception as e:
+            print(f"Error fetching {source['name']}: {e}")
+            return None
+
+    def commit_feed_state(self, skip=()):
+        """
+        Persist the validators of feeds fetched this pulse, except for source
+        names in `skip` (articles that couldn't be fully processed), so those
+        feeds are downloaded and re-read on the next pulse.
+        """
+        for name, new_state in list(self.pending_feed_state.items()):
+            if name not in skip:
+                save_feed_state(self.db, new_state)
+        self.pending_feed_state.clear()
+
+    def iter_rss(self):
+        """
+        Yield Articles feed by feed as downloads finish (completion order,
+        not sources.json order), so the pulse can start on the first feed while
+        slower ones are still downloading.
+        """
         sources = self.load_sources()
-        articles = []
-        for source in sources.get("rss", []):
-            feed = feedparser.parse(source['url'])
-            for entry in feed.entries[:20]: # Expanded scan range (filtered later)
-                title = entry.title
-                link = entry.link
-                summary = getattr(entry, 'summary', '')
-                
-                title_hash = self.db.generate_hash(title)
-                if not self.db.is_duplicate(title_hash):
-                    articles.append({
-                        "source": source['name'],
-                        "title": title,
-                        "link": link,
-                        "text": f"{title}\n{summary}",
-                        "hash": title_hash
-                    })
-        return articles
+        rss_sources = sources.get("rss", [])
+        if not rss_sources:
+            return
+
+        # Download every feed in parallel; parse each body as soon as it lands
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(rss_sources))) as pool:
+            futures = {pool.submit(self._download_feed, source): source for source in rss_sources}
+            for future in as_completed(futures):
+                source = futures.pop(future)
+                body = future.result()
+                if body is None:
+                    continue
+                feed = feedparser.parse(body)
+                del body
+                for entry in feed.entries[:20]: # Expanded scan range (filtered later)
+                    title = entry.title
+                    link = entry.link
+                    summary = getattr(entry, 'summary', '')
+
+                    # Dedupe happens in run_2hour_pulse
+                    yield Article(source['name'], title, summary, link, self.db.generate_hash(title))
+
+    def fetch_rss(self):
+        return list(self.iter_rss())
 
     def fetch_reddit(self):
         # Placeholder for PRAW logic
         # Requires REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
         return []
 
+    def iter_all(self):
+        yield from self.iter_rss()
+        yield from self.fetch_reddit()
+
     def fetch_all(self):
-        return self.fetch_rss() + self.fetch_reddit()
+        return list(self.iter_all())
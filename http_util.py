@@ -0,0 +1,97 @@
+"""
+Shared HTTP helpers for the feeders.
+"""
+
+import hashlib
+import threading
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import openmetrics
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name="default", retries=4, backoff_factor=1.0, pool_size=10):
+    """
+    Process-wide pooled requests.Session, one per `name`.
+
+    Connections are kept alive between calls (no fresh TLS handshake per
+    request). Connect errors and 429/5xx responses are retried with
+    exponential backoff, honoring the server's Retry-After header; read
+    errors/timeouts are not, since the server may already have done (and
+    billed) the work. Timeouts are per request; pass `timeout=` on every call.
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            retry = Retry(
+                total=retries,
+                read=0,
+                backoff_factor=backoff_factor,
+                status_forcelist=(429, 500, 502, 503, 504),
+                # POST is not idempotent by default; LLM completions are safe to replay
+                allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+        return session
+
+
+def record_http_error(url):
+    # Per-host error counter for the OpenMetrics export
+    openmetrics.HTTP_ERRORS.inc(host=urlparse(url).netloc)
+
+
+def conditional_get(db, url, headers=None, timeout=15):
+    """
+    Fetch a feed with If-None-Match / If-Modified-Since using the validators
+    persisted in the feed_state table.
+
+    Returns (status_code, body, new_state). body is None when the feed has
+    not changed since the last fetch (HTTP 304, or a 200 whose content hash
+    matches the stored one) or when the server answered with an error status.
+    new_state is set only alongside a changed body: the caller saves it with
+    save_feed_state() once the feed's articles have been processed, so a
+    pulse that fails half-way refetches the feed next time instead of getting
+    a 304 and losing those entries.
+    """
+    state = db.get_feed_state(url)
+    request_headers = dict(headers or {})
+    if state:
+        if state["etag"]:
+            request_headers["If-None-Match"] = state["etag"]
+        if state["last_modified"]:
+            request_headers["If-Modified-Since"] = state["last_modified"]
+
+    try:
+        response = requests.get(url, headers=request_headers, timeout=timeout)
+    except requests.RequestException:
+        record_http_error(url)
+        raise
+    if response.status_code == 304:
+        return 304, None, None
+    if response.status_code != 200:
+        record_http_error(url)
+        return response.status_code, None, None
+
+    body = response.content
+    new_state = (url, response.headers.get("ETag"), response.headers.get("Last-Modified"), hashlib.sha1(body).hexdigest())
+    # Servers without validators still get caught by the body hash
+    if state and state["content_hash"] == new_state[3]:
+        # Nothing to process, so fresher validators can be stored right away
+        save_feed_state(db, new_state)
+        return 200, None, None
+    return 200, body, new_state
+
+
+def save_feed_state(db, new_state):
+    # new_state as returned by conditional_get()
+    db.save_feed_state(*new_state)
@@ -1,37 +1,137 @@
 import os
-import requests
 import json
+import hashlib
+import threading
+import time
 import re
 from dotenv import load_dotenv
+from http_util import get_session, record_http_error
+from database import Database
+import metrics
 
 # Load environment variables
 load_dotenv(dotenv_path="/root/daily_brief/.env")
 
+# Shared by the single and batched bouncer prompts
+RELEVANCE_CRITERIA = """Keep ONLY items related to:
+1. Breakthrough Battery Tech (Solid State, Sodium-Ion, Anode/Cathode physics).
+2. AGI/ASI milestones & significant AI architectural shifts (OAI, Anthropic, xAI, Meta).
+3. Crypto Market Structure shifts (ETF flows, sovereign adoption, major regulatory moves).
+4. Geopolitical events DIRECTLY impacting supply chains or energy (Oil, TASI, US/China).
+5. Data Centers & AI Infrastructure.
+"""
+# Per-item summary cap inside a batched relevance request
+BATCH_SUMMARY_CHARS = 1000
+
 class LogicEngine:
-    def __init__(self):
+    # Response cache counters, shared by every engine in the process
+    _cache_stats = {"hits": 0, "misses": 0, "tokens_saved": 0}
+    _cache_stats_lock = threading.Lock()
+    _cache_puts = 0
+
+    def __init__(self, db=None):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         self.url = "https://openrouter.ai/api/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # Shared keep-alive session with retry/backoff on 429/5xx
+        self.session = get_session("openrouter")
+        self.timeout = (
+            float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10")),
+            float(os.getenv("OPENROUTER_READ_TIMEOUT", "120")),
+        )
+        # Persistent response cache; LLM_CACHE_TTL=0 disables it
+        self.db = db or Database()
+        self.cache_ttl = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        self.cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+    def _chat(self, payload):
+        """
+        POST a chat completion to OpenRouter and return the decoded JSON body.
+        Identical payloads (model, prompts, params) are served from the
+        llm_cache table while younger than LLM_CACHE_TTL. Only usable answers
+        are cached (see _usable); an unusable cached entry is dropped and the
+        request is sent again.
+        Raises on transport errors and on non-2xx after retries are exhausted.
+        """
+        key = self._cache_key(payload)
+        if self.cache_ttl > 0:
+            cached = self.db.get_llm_cache(key, self.cache_ttl)
+            result = json.loads(cached) if cached is not None else None
+            if result is not None and not self._usable(payload, result):
+                self.db.delete_llm_cache(key)
+                result = None
+            if result is not None:
+                with LogicEngine._cache_stats_lock:
+                    LogicEngine._cache_stats["hits"] += 1
+                    LogicEngine._cache_stats["tokens_saved"] += (result.get('usage') or {}).get('total_tokens', 0)
+                metrics.record_llm_call(0.0, result.get('usage'), cached=True)
+                return result
+
+        start = time.monotonic()
+        try:
+            response = self.session.post(self.url, headers=self.headers, data=json.dumps(payload), timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except Exception:
+            metrics.record_llm_error()
+            record_http_error(self.url)
+            raise
+        metrics.record_llm_call(time.monotonic() - start, result.get('usage'))
+
+        if self.cache_ttl > 0 and self._usable(payload, result):
+            self.db.put_llm_cache(key, json.dumps(result))
+            with LogicEngine._cache_stats_lock:
+                LogicEngine._cache_stats["misses"] += 1
+                LogicEngine._cache_puts += 1
+                evict = LogicEngine._cache_puts % 50 == 0
+            if evict:
+                self.db.evict_llm_cache(self.cache_ttl, self.cache_max_entries)
+        return result
+
+    @staticmethod
+    def _cache_key(payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _usable(payload, result):
+        # Non-empty text content, which must also parse for json_object requests
+        try:
+            content = result['choices'][0]['message']['content']
+            if not isinstance(content, str) or not content.strip():
+                return False
+            if (payload.get('response_format') or {}).get('type') == 'json_object':
+                json.loads(content)
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, payload):
+        # Evict a cached answer the caller couldn't use, so the next call asks again
+        if self.cache_ttl > 0:
+            self.db.delete_llm_cache(self._cache_key(payload))
+
+    @classmethod
+    def cache_stats(cls):
+        with cls._cache_stats_lock:
+            stats = dict(cls._cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
 
     def assess_relevance(self, title, summary):
         """
         The Bouncer: Filter out news irrelevant to the portfolio.
+        Returns None (falsy, so still a "no") if the item couldn't be judged.
         """
-        system_prompt = """
+        system_prompt = f"""
 You are the Gatekeeper for a high-level intelligence briefing.
 Your job: Filter out noise, clickbait, and irrelevant news.
-Keep ONLY items related to:
-1. Breakthrough Battery Tech (Solid State, Sodium-Ion, Anode/Cathode physics).
-2. AGI/ASI milestones & significant AI architectural shifts (OAI, Anthropic, xAI, Meta).
-3. Crypto Market Structure shifts (ETF flows, sovereign adoption, major regulatory moves).
-4. Geopolitical events DIRECTLY impacting supply chains or energy (Oil, TASI, US/China).
-5. Data Centers & AI Infrastructure.
-
+{RELEVANCE_CRITERIA}
 Input: Title + Summary
-Output: JSON {"keep": true/false, "reason": "short reason"}
+Output: JSON {{"keep": true/false, "reason": "short reason"}}
 """
         messages = [
             {"role": "system", "content": system_prompt},
@@ -44,14 +144,71 @@ Output: JSON {"keep": true/false, "reason": "short reason"}
                 "messages": messages,
                 "response_format": {"type": "json_object"}
             }
-            response = requests.post(self.url, headers=self.headers, data=json.dumps(payload))
-            response.raise_for_status()
-            result = response.json()
+            result = self._chat(payload)
+            content = json.loads(result['choices'][0]['message']['content'])
+            keep = content.get("keep")
+            if not isinstance(keep, bool):
+                self._forget(payload)
+                return None
+            return keep
+        except Exception:
+            # Fail closed on errors to save tokens/processing; None marks "not judged"
+            return None
+
+    def assess_relevance_batch(self, items):
+        """
+        The Bouncer, batched: judge many (title, summary) pairs in one request.
+        Returns a list of keep booleans aligned with `items`. Items the model
+        leaves out or answers malformed are re-checked one by one; items that
+        couldn't be judged at all come back as None.
+        """
+        if not items:
+            return []
+        system_prompt = f"""
+You are the Gatekeeper for a high-level intelligence briefing.
+Your job: Filter out noise, clickbait, and irrelevant news.
+{RELEVANCE_CRITERIA}
+Input: A numbered list of items, each with an id, Title and Summary.
+Output: JSON {{"verdicts": [{{"id": <id>, "keep": true/false, "reason": "short reason"}}, ...]}}
+Return exactly one verdict per input id.
+"""
+        listing = "\n\n".join(
+            f"[id: {i}]\nTitle: {title}\nSummary: {summary[:BATCH_SUMMARY_CHARS]}"
+            for i, (title, summary) in enumerate(items)
+        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": listing}
+        ]
+        payload = {
+            "model": "google/gemini-2.0-flash-001",
+            "messages": messages,
+            "response_format": {"type": "json_object"}
+        }
+
+        try:
+            result = self._chat(payload)
+        except Exception:
+            # Fail closed on transport errors, same as the single-item bouncer
+            return [None] * len(items)
+
+        verdicts = {}
+        try:
             content = json.loads(result['choices'][0]['message']['content'])
-            return content.get("keep", False)
+            for verdict in content.get("verdicts", []):
+                keep = verdict.get("keep")
+                if isinstance(keep, bool):
+                    verdicts[int(verdict["id"])] = keep
         except Exception:
-            # Fail closed on errors to save tokens/processing
-            return False 
+            pass
+        if not verdicts:
+            # Nothing usable in this answer; don't keep serving it from the cache
+            self._forget(payload)
+
+        return [
+            verdicts[i] if i in verdicts else self.assess_relevance(title, summary)
+            for i, (title, summary) in enumerate(items)
+        ]
 
     def analyze(self, text, previous_context=None):
         """
@@ -88,9 +245,7 @@ Output Format (Bullet points):
         }
 
         try:
-            response = requests.post(self.url, headers=self.headers, data=json.dumps(payload))
-            response.raise_for_status()
-            result = response.json()
+            result = self._chat(payload)
             return result['choices'][0]['message']['content'].strip()
         except Exception as e:
             print(f"Error in LogicEngine: {e}")
@@ -149,9 +304,7 @@ Output Format (Bullet points):
         }
 
         try:
-            response = requests.post(self.url, headers=self.headers, data=json.dumps(payload))
-            response.raise_for_status()
-            result = response.json()
+            result = self._chat(payload)
             return result['choices'][0]['message']['content'].strip()
         except Exception as e:
             print(f"Error generating wrap: {e}")
@@ -178,9 +331,7 @@ Preserve the Markdown structure (tables, headers, bold text).
         }
         
         try:
-            response = requests.post(self.url, headers=self.headers, data=json.dumps(payload))
-            response.raise_for_status()
-            result = response.json()
+            result = self._chat(payload)
             return result['choices'][0]['message']['content'].strip()
         except Exception as e:
             print(f"Error in translation: {e}")
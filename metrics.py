@@ -0,0 +1,143 @@
+"""
+Per-run pipeline metrics: wall time per stage plus LLM call latency and the
+token usage OpenRouter reports.
+
+One run is active per process at a time (start_run ... finish_run). Feeders,
+the LogicEngine and the pipeline stages report into it through the module
+helpers below, which do nothing when no run is active. finish_run persists a
+summary row to the pulse_runs table. Stage timings and LLM calls are also fed
+to the cumulative OpenMetrics series in openmetrics.py.
+
+Stage times are summed per stage name. Stages that run concurrently (fetches,
+relevance batches, analyses) can therefore add up to more than the run's wall
+time; "duration" is the real elapsed time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import openmetrics
+
+_active = None
+_active_lock = threading.Lock()
+
+
+class RunMetrics:
+    def __init__(self, kind):
+        self.kind = kind
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        # name -> [total seconds, calls]
+        self.stages = {}
+        self.counts = {}
+        self.llm_latencies = []
+        self.llm_cached = 0
+        self.tokens = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def add_llm_call(self, latency, usage, cached=False):
+        with self._lock:
+            if cached:
+                self.llm_cached += 1
+                return
+            self.llm_latencies.append(latency)
+            for key in self.tokens:
+                self.tokens[key] += int((usage or {}).get(key) or 0)
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self.llm_latencies)
+
+            def percentile(p):
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+            return {
+                "kind": self.kind,
+                "started_at": self.started_at,
+                "duration": round(time.monotonic() - self._start, 3),
+                "stages": {name: {"seconds": round(s, 3), "calls": n} for name, (s, n) in self.stages.items()},
+                "counts": dict(self.counts),
+                "llm_calls": len(latencies),
+                "llm_cached_calls": self.llm_cached,
+                "llm_latency_p50": percentile(0.5),
+                "llm_latency_p95": percentile(0.95),
+                "llm_latency_max": round(latencies[-1], 3) if latencies else None,
+                **self.tokens,
+            }
+
+
+def start_run(kind="pulse"):
+    global _active
+    with _active_lock:
+        _active = RunMetrics(kind)
+        return _active
+
+
+def current():
+    return _active
+
+
+def finish_run(db):
+    """
+    Close the active run, save it to pulse_runs and return its summary
+    (None if no run was active).
+    """
+    global _active
+    with _active_lock:
+        run, _active = _active, None
+    if run is None:
+        return None
+    summary = run.summary()
+    db.save_pulse_run(summary)
+    return summary
+
+
+@contextmanager
+def timed(stage):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        # Per-source fetch stages ("fetch:<name>") stay out of the histogram labels
+        if ":" not in stage:
+            openmetrics.STAGE_DURATION.observe(elapsed, stage=stage)
+        run = _active
+        if run is not None:
+            run.add_stage(stage, elapsed)
+
+
+def incr(name, n=1):
+    run = _active
+    if run is not None:
+        run.incr(name, n)
+
+
+def record_llm_call(latency, usage, cached=False):
+    if cached:
+        openmetrics.LLM_REQUESTS.inc(outcome="cached")
+    else:
+        openmetrics.LLM_REQUESTS.inc(outcome="ok")
+        openmetrics.LLM_LATENCY.observe(latency)
+        for key in ("prompt_tokens", "completion_tokens"):
+            openmetrics.LLM_TOKENS.inc(int((usage or {}).get(key) or 0), type=key.split("_")[0])
+    run = _active
+    if run is not None:
+        run.add_llm_call(latency, usage, cached)
+
+
+def record_llm_error():
+    openmetrics.LLM_REQUESTS.inc(outcome="error")
@@ -0,0 +1,198 @@
+"""
+Prometheus/OpenMetrics export for the pipeline, without extra dependencies.
+
+Counters, gauges and histograms live in this module's registry. After each run
+the pipeline saves their state to the meta table (so counters keep counting
+across cron-launched processes) and writes the exposition text to
+METRICS_TEXTFILE for node_exporter's textfile collector. In daemon mode, if
+METRICS_PORT is set, the same text is also served on 127.0.0.1:<port>/metrics.
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATE_KEY = "openmetrics:state"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Seconds; spans a cached LLM hit up to a slow publish
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_families = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        with _lock:
+            _families.append(self)
+
+    def _samples(self):
+        # Unlabelled series are reported as 0 before their first update
+        if not self.values and not self.labels:
+            return [((), 0)]
+        return sorted(self.values.items())
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def header(self):
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help}"]
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        return [f"{self.name}_total{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in self._samples()]
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[self._key(labels)] = value
+
+    def render(self):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in self._samples()]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # [per-bucket counts (non-cumulative), sum, count]
+            state = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = []
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', repr(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+ARTICLES_FETCHED = Counter("dailybrief_articles_fetched", "Articles yielded by the feeders.", ["source"])
+DEDUPE_CHECKED = Counter("dailybrief_dedupe_checked", "Articles checked against the mentions history.")
+DEDUPE_NEW = Counter("dailybrief_dedupe_new", "Articles that were not duplicates.")
+RELEVANCE_JUDGED = Counter("dailybrief_relevance_judged", "Articles judged by the relevance bouncer.")
+RELEVANCE_KEPT = Counter("dailybrief_relevance_kept", "Articles the relevance bouncer kept.")
+MENTIONS_SAVED = Counter("dailybrief_mentions_saved", "Analyses saved to the mentions table.")
+LLM_REQUESTS = Counter("dailybrief_llm_requests", "OpenRouter chat requests by outcome (ok, cached, error).", ["outcome"])
+LLM_TOKENS = Counter("dailybrief_llm_tokens", "Tokens reported in OpenRouter usage.", ["type"])
+LLM_LATENCY = Histogram("dailybrief_llm_request_duration_seconds", "OpenRouter request latency (cache misses only).")
+HTTP_ERRORS = Counter("dailybrief_http_errors", "Failed HTTP fetches (error status or transport error) by host.", ["host"])
+STAGE_DURATION = Histogram("dailybrief_stage_duration_seconds", "Pipeline stage durations, including publish and git_push.", ["stage"])
+RUNS = Counter("dailybrief_runs", "Completed pipeline runs.")
+LAST_RUN = Gauge("dailybrief_last_run_timestamp_seconds", "Unix time the last pipeline run finished.")
+LAST_RUN_DURATION = Gauge("dailybrief_last_run_duration_seconds", "Wall time of the last pipeline run.")
+
+
+def render():
+    with _lock:
+        lines = []
+        for family in _families:
+            lines.extend(family.header())
+            lines.extend(family.render())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def load_state(db):
+    # Restore values saved by a previous process; families added since start at zero
+    raw = db.get_meta(STATE_KEY)
+    if not raw:
+        return
+    state = json.loads(raw)
+    with _lock:
+        for family in _families:
+            saved = state.get(family.name)
+            if saved is not None:
+                family.values = {tuple(key): value for key, value in saved}
+
+
+def save_state(db):
+    with _lock:
+        state = {family.name: [[list(key), value] for key, value in family.values.items()] for family in _families}
+    db.set_meta(STATE_KEY, json.dumps(state))
+
+
+def write_textfile(path):
+    # Write-then-rename: the textfile collector must never read a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """
+    Serve /metrics on a daemon thread. Returns the server (call shutdown() to stop).
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
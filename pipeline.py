@@ -1,16 +1,27 @@
 import os
 import gc
 import sys
+import time
+import fcntl
+import random
+import signal
 import logging
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, timedelta
 from dotenv import load_dotenv
 from feeder import Feeder
 from social_feeder import SocialFeeder
 from logic_engine import LogicEngine
 from database import Database
+from source_registry import SourceRegistry
 from telegram_util import send_telegram_message
 import subprocess
-from publish import generate_html
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from publish import generate_html, mark_published
+import metrics
+import openmetrics
 
 
 # Load environment variables
@@ -19,53 +30,203 @@ load_dotenv(dotenv_path="/root/daily_brief/.env")
 # Configuration
 LOG_FILE = "/root/daily_brief/logs/pipeline.log"
 logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s - %(message)s')
+# Parallel OpenRouter calls per stage; keep within the account's rate limit
+LLM_CONCURRENCY = max(1, int(os.getenv("LLM_CONCURRENCY", "4")))
+# Articles judged per bouncer request
+RELEVANCE_BATCH_SIZE = max(1, int(os.getenv("RELEVANCE_BATCH_SIZE", "20")))
+# Daemon mode (--daemon): seconds between pulses, plus up to PULSE_JITTER random delay
+PULSE_INTERVAL = int(os.getenv("PULSE_INTERVAL", "7200"))
+PULSE_JITTER = int(os.getenv("PULSE_JITTER", "300"))
+# Last day wrapped ('YYYY-MM-DD' in meta) and how far back a missed wrap is caught up
+LAST_WRAP_KEY = "last_wrap_date"
+WRAP_CATCHUP_DAYS = 3
+CYCLE_LOCK_FILE = "/root/daily_brief/pipeline.lock"
+# OpenMetrics export: textfile-collector path and/or local scrape port (daemon mode only)
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Max articles handed from the feeders to the pulse at a time
+STREAM_CHUNK = 100
+
+def stream_articles(*generators):
+    """
+    Merge several article generators, each drained on its own thread, into one
+    stream. Yields lists of whatever articles are ready (at most STREAM_CHUNK)
+    so downstream stages can batch their work. The bounded queue keeps fast
+    feeders from running far ahead of the pulse; if the consumer stops early
+    (an exception, or the stream is closed) the producers are told to stop
+    and close their generators instead of blocking on a full queue forever.
+    """
+    ready = queue.Queue(maxsize=STREAM_CHUNK * 2)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        # False once the consumer has gone away
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(generator):
+        try:
+            for article in generator:
+                if not put(article):
+                    break
+        except Exception as e:
+            logging.error(f"Feeder error: {e}")
+        finally:
+            try:
+                # Runs the feeder's cleanup (its download pool) right away
+                close = getattr(generator, "close", None)
+                if close is not None:
+                    close()
+            except Exception as e:
+                logging.error(f"Feeder cleanup error: {e}")
+            finally:
+                put(done)
+
+    producers = [threading.Thread(target=drain, args=(iter(generator),), daemon=True) for generator in generators]
+    for producer in producers:
+        producer.start()
+
+    try:
+        remaining = len(generators)
+        while remaining:
+            chunk = []
+            try:
+                item = ready.get(timeout=1)
+            except queue.Empty:
+                # A producer that died without its sentinel would otherwise hang the pulse
+                if not any(producer.is_alive() for producer in producers) and ready.empty():
+                    logging.error(f"{remaining} feeder(s) stopped without finishing; ending the stream.")
+                    break
+                continue
+            while True:
+                if item is done:
+                    remaining -= 1
+                else:
+                    chunk.append(item)
+                if len(chunk) >= STREAM_CHUNK:
+                    break
+                try:
+                    item = ready.get_nowait()
+                except queue.Empty:
+                    break
+            if chunk:
+                yield chunk
+    finally:
+        stop.set()
 
 def run_2hour_pulse():
     logging.info("Starting 2-hour pulse...")
-    feeder = Feeder()
-    social_feeder = SocialFeeder()
+    # Parse sources.json once and pin that snapshot for the whole pulse
+    sources = SourceRegistry.get().load()
+    logging.info(f"Loaded sources.json version {sources.get('version', 0)}")
+    feeder = Feeder(sources=sources)
+    social_feeder = SocialFeeder(sources=sources)
     engine = LogicEngine()
     db = Database()
     
-    # 1. Fetch new articles from RSS feeds
-    articles = feeder.fetch_all()
-    logging.info(f"Fetched {len(articles)} articles from RSS feeds.")
-    
-    # 2. Fetch from social media (Reddit, X/Twitter)
-    social_articles = social_feeder.fetch_all()
-    logging.info(f"Fetched {len(social_articles)} articles from social media.")
-    
-    # Combine all sources
-    articles.extend(social_articles)
-    logging.info(f"Total articles to process: {len(articles)}")
-    
     new_toon_phrases = []
-    
-    # 2. Process each article
-    for article in articles:
-        # Generate hash and check deduplication (Feeder already does some, but double check)
-        title_hash = article['hash']
-        if db.is_duplicate(title_hash):
-            continue
-            
-        # 3. New Filter Stage: The Bouncer
-        # Only meaningful content gets past here.
-        if not engine.assess_relevance(article['title'], article['text']):
-            logging.info(f"Skipped low relevance: {article['title']}")
-            continue
-
-        # 4. Use Logic Engine to analyze (The Deep Dive)
-        # Get recent context for "Talk-Through"
-        context = db.get_recent_toon_phrases(limit=3)
-        analysis = engine.analyze(article['text'], previous_context=context)
-        
-        if analysis:
-            # 5. Save to Memory
-            db.add_mention(article['source'], article['text'], analysis, title_hash, url=article.get('link'))
-            new_toon_phrases.append(analysis)
-            logging.info(f"Analyzed & Saved: {article['title']}")
+    fetched = 0
+    candidates = 0
+    # Hashes already queued this pulse (drops repeats across feeds)
+    seen = set()
+    # Sources with an article the LLM stages failed on; their feeds are re-read next pulse
+    failed_sources = set()
+    # Recent context for "Talk-Through", snapshotted once since analyses run concurrently
+    context = db.get_recent_toon_phrases(limit=3)
+    pending = []
+    relevance_jobs = []
+    analysis_jobs = []
+
+    def judge(batch):
+        with metrics.timed("relevance"):
+            return batch, engine.assess_relevance_batch([(a.title, a.text) for a in batch])
+
+    def analyze(article):
+        with metrics.timed("analysis"):
+            return engine.analyze(article.text, previous_context=context)
+
+    def collect_verdicts(wait):
+        # 4. Hand articles that passed the bouncer to the Logic Engine (The Deep Dive)
+        while relevance_jobs and (wait or relevance_jobs[0].done()):
+            batch, verdicts = relevance_jobs.pop(0).result()
+            openmetrics.RELEVANCE_JUDGED.inc(len(batch))
+            for article, keep in zip(batch, verdicts):
+                if keep is None:
+                    failed_sources.add(article.source)
+                    logging.info(f"Relevance check failed: {article.title}")
+                elif keep:
+                    metrics.incr("relevant")
+                    openmetrics.RELEVANCE_KEPT.inc()
+                    analysis_jobs.append((article, pool.submit(analyze, article)))
+                else:
+                    logging.info(f"Skipped low relevance: {article.title}")
+
+    def save_analyses(wait):
+        # 5. Save to Memory, in the order articles passed the bouncer
+        while analysis_jobs and (wait or analysis_jobs[0][1].done()):
+            article, job = analysis_jobs.pop(0)
+            analysis = job.result()
+            if not analysis:
+                failed_sources.add(article.source)
+            else:
+                with metrics.timed("db_write"):
+                    db.add_mention(article.source, article.text, analysis, article.hash, url=article.link)
+                metrics.incr("saved")
+                openmetrics.MENTIONS_SAVED.inc()
+                new_toon_phrases.append(analysis)
+                logging.info(f"Analyzed & Saved: {article.title}")
+
+    # LLM stages run on a bounded pool while feeds are still downloading
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as pool:
+        # 1-2. RSS feeds and social media (Reddit, X/Twitter) stream in concurrently
+        for chunk in stream_articles(feeder.iter_all(), social_feeder.iter_all()):
+            fetched += len(chunk)
+            for article in chunk:
+                openmetrics.ARTICLES_FETCHED.inc(source=article.source)
+            # Dedupe each chunk in one query as it arrives
+            with metrics.timed("dedupe"):
+                new_hashes = db.filter_new_hashes([article.hash for article in chunk]) - seen
+            for article in chunk:
+                if article.hash in new_hashes:
+                    new_hashes.discard(article.hash)
+                    seen.add(article.hash)
+                    pending.append(article)
+                    candidates += 1
+
+            # 3. New Filter Stage: The Bouncer
+            # Only meaningful content gets past here.
+            # Many articles per request; batches themselves run in parallel
+            while len(pending) >= RELEVANCE_BATCH_SIZE:
+                relevance_jobs.append(pool.submit(judge, pending[:RELEVANCE_BATCH_SIZE]))
+                del pending[:RELEVANCE_BATCH_SIZE]
+            collect_verdicts(wait=False)
+            save_analyses(wait=False)
+
+        if pending:
+            relevance_jobs.append(pool.submit(judge, pending))
+        collect_verdicts(wait=True)
+        logging.info(f"Fetched {fetched} articles; {candidates} new after deduplication.")
+        openmetrics.DEDUPE_CHECKED.inc(fetched)
+        openmetrics.DEDUPE_NEW.inc(candidates)
+        metrics.incr("fetched", fetched)
+        metrics.incr("candidates", candidates)
+        logging.info(f"Dedupe cache stats: {db.dedupe_cache.stats()}")
+
+        save_analyses(wait=True)
+
+    # Only now remember feed validators, so unprocessed entries aren't lost behind a 304
+    if failed_sources:
+        logging.info(f"Not advancing feed state for {len(failed_sources)} sources with failed LLM calls.")
+    feeder.commit_feed_state(skip=failed_sources)
+    social_feeder.commit_feed_state(skip=failed_sources)
         
-    # 5. Send to Telegram
+    # 6. Send to Telegram
     if new_toon_phrases:
         # Combine 3-5 punchy toon phrases
         summary = "\n\n".join(new_toon_phrases[:5])
@@ -74,50 +235,105 @@ def run_2hour_pulse():
         logging.info("Sent pulse to Telegram.")
     else:
         logging.info("No new significant insights to report.")
+    logging.info(f"LLM cache stats: {LogicEngine.cache_stats()}")
 
-def run_24hour_wrap():
-    logging.info("Starting 24-hour wrap...")
+def run_24hour_wrap(day):
+    """
+    Build, send and save the executive brief for one finished day ('YYYY-MM-DD').
+    Returns True once the day is settled (wrapped, or nothing to wrap) and
+    False if the brief could not be generated, so the caller retries later.
+    """
+    logging.info(f"Starting 24-hour wrap for {day}...")
     db = Database()
     engine = LogicEngine()
     
-    # Get all toon phrases from today
-    today = datetime.now().strftime('%Y-%m-%d')
-    phrases = db.get_daily_phrases(today)
+    # Get all toon phrases from that day
+    phrases = db.get_daily_phrases(day)
     
-    if phrases:
-        # Transform the raw toon phrases into a professional executive brief
-        content = "\n\n".join(phrases)
+    if not phrases:
+        logging.info(f"No phrases found for {day}'s wrap.")
+        return True
+
+    # Transform the raw toon phrases into a professional executive brief
+    content = "\n\n".join(phrases)
+    with metrics.timed("wrap"):
         wrap = engine.generate_executive_brief(content)
-        if wrap:
-            # Send to Telegram
-            message = f"📊 *Executive Brief: Daily Intelligence Summary*\n\n{wrap}"
-            send_telegram_message(message)
-            logging.info("Sent daily executive brief to Telegram.")
-            
-            # Save wrap
-            db.save_daily_wrap(today, wrap)
+    if not wrap:
+        logging.error(f"Executive brief for {day} failed; will retry next run.")
+        return False
+
+    # Save wrap together with its Arabic translation (reused by every publish)
+    with metrics.timed("wrap"):
+        wrap_ar = engine.translate_to_arabic(wrap)
+    db.save_daily_wrap(day, wrap, wrap_ar)
+
+    # Send to Telegram
+    message = f"📊 *Executive Brief: Daily Intelligence Summary*\n\n{wrap}"
+    send_telegram_message(message)
+    logging.info("Sent daily executive brief to Telegram.")
+    return True
+
+def run_due_wraps():
+    """
+    Wrap every finished day since the last wrap recorded in meta (at most
+    WRAP_CATCHUP_DAYS back), so a run that slips past midnight, or a few
+    missed runs, neither skip a day nor wrap it twice.
+    """
+    db = Database()
+    yesterday = date.today() - timedelta(days=1)
+    last = db.get_meta(LAST_WRAP_KEY)
+    if last:
+        day = date.fromisoformat(last) + timedelta(days=1)
     else:
-        logging.info("No phrases found for today's wrap.")
+        # First run with this scheme: start with the day that just ended
+        day = yesterday
+    day = max(day, yesterday - timedelta(days=WRAP_CATCHUP_DAYS - 1))
+
+    while day <= yesterday:
+        if not run_24hour_wrap(day.isoformat()):
+            break
+        db.set_meta(LAST_WRAP_KEY, day.isoformat())
+        day += timedelta(days=1)
 
 def run_publish():
     logging.info("Generating and pushing dashboard...")
     try:
-        # Run publish.py content generation directly
-        generate_html()
+        # Run publish.py content generation directly; None means nothing changed
+        with metrics.timed("publish"):
+            fingerprint = generate_html()
+        if fingerprint is None:
+            logging.info("Dashboard inputs unchanged; skipping render and push.")
+            return
         
         # Git push
-        subprocess.run(["git", "add", "docs/index.html", ".nojekyll", "docs/.nojekyll"], check=True)
-        # Commit if there are changes
-        commit_result = subprocess.run(["git", "commit", "-m", "Auto-update intelligence dashboard"], capture_output=True, text=True)
-        if "nothing to commit" not in commit_result.stdout:
-            subprocess.run(["git", "push", "origin", "master"], check=True)
-            logging.info("Dashboard pushed to GitHub.")
-        else:
-            logging.info("No changes to dashboard.")
+        with metrics.timed("git_push"):
+            subprocess.run(["git", "add", "docs/index.html", "docs/assets", "docs/archive", "docs/search", ".nojekyll", "docs/.nojekyll"], check=True)
+            # Commit if there are changes
+            commit_result = subprocess.run(["git", "commit", "-m", "Auto-update intelligence dashboard"], capture_output=True, text=True)
+            if "nothing to commit" not in commit_result.stdout:
+                subprocess.run(["git", "push", "origin", "master"], check=True)
+                logging.info("Dashboard pushed to GitHub.")
+            else:
+                logging.info("No changes to dashboard.")
+        # Only remember the inputs once they're live, so a failed push is retried
+        mark_published(fingerprint)
     except Exception as e:
         logging.error(f"Publishing error: {e}")
 
 
+def export_metrics(db, summary):
+    """
+    Fold a finished run into the cumulative OpenMetrics series, persist them
+    and rewrite the textfile-collector file.
+    """
+    openmetrics.RUNS.inc()
+    openmetrics.LAST_RUN.set(time.time())
+    if summary:
+        openmetrics.LAST_RUN_DURATION.set(summary["duration"])
+    openmetrics.save_state(db)
+    if METRICS_TEXTFILE:
+        openmetrics.write_textfile(METRICS_TEXTFILE)
+
 def cleanup():
     logging.info("Running Janitor...")
     # Force Garbage Collection
@@ -127,24 +343,83 @@ def cleanup():
     os.system("pkill -9 chromedriver || true")
     logging.info("Janitor finished.")
 
-if __name__ == "__main__":
-    try:
-        # Check if it's midnight for the daily wrap
-        now = datetime.now()
-        
-        # Always run the 2-hour pulse
-        run_2hour_pulse()
-        
-        # If it's the 00:00 (or near it) run, do the daily wrap
-        if now.hour == 0:
-            run_24hour_wrap()
-            
-        # Always publish the latest stream
-        run_publish()
+@contextmanager
+def cycle_lock():
+    """
+    Exclusive, non-blocking lock around one pulse/wrap/publish cycle, so a
+    leftover cron entry can never run alongside the daemon (or itself).
+    Yields False if another process holds it.
+    """
+    with open(CYCLE_LOCK_FILE, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
+def run_cycle(kind):
+    with cycle_lock() as acquired:
+        if not acquired:
+            logging.info("Another pipeline run is in progress; skipping this cycle.")
+            return
+        metrics.start_run(kind)
+        try:
+            # Always run the 2-hour pulse
+            run_2hour_pulse()
             
-    except Exception as e:
-        logging.error(f"Pipeline error: {e}")
-    finally:
-        cleanup()
-        sys.exit(0)
+            # Wrap any finished day that hasn't been wrapped yet
+            run_due_wraps()
+                
+            # Always publish the latest stream
+            run_publish()
+        except Exception as e:
+            logging.error(f"Pipeline error: {e}")
+        finally:
+            try:
+                db = Database()
+                summary = metrics.finish_run(db)
+                logging.info(f"Run metrics: {summary}")
+                export_metrics(db, summary)
+            except Exception as e:
+                logging.error(f"Metrics error: {e}")
+            cleanup()
+
+def run_daemon():
+    """
+    Resident scheduler: one cycle every PULSE_INTERVAL seconds (plus up to
+    PULSE_JITTER seconds of random delay), reusing the warm database
+    connection, dedupe filter, HTTP sessions and parsed sources between runs.
+    Stops cleanly on SIGTERM/SIGINT.
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    logging.info(f"Pipeline daemon started (interval {PULSE_INTERVAL}s, jitter {PULSE_JITTER}s).")
+    if METRICS_PORT:
+        # Scrape endpoint only for the resident process; cron runs use METRICS_TEXTFILE
+        try:
+            openmetrics.serve(METRICS_PORT)
+        except OSError as e:
+            logging.error(f"Metrics endpoint on port {METRICS_PORT} unavailable: {e}")
+
+    next_run = time.monotonic()
+    while not stop.is_set():
+        run_cycle("daemon")
+        # Fixed-rate schedule: a slow cycle doesn't push every later one back
+        next_run += PULSE_INTERVAL
+        if next_run < time.monotonic():
+            next_run = time.monotonic()
+        stop.wait(next_run - time.monotonic() + random.uniform(0, PULSE_JITTER))
+    logging.info("Pipeline daemon stopped.")
+
+if __name__ == "__main__":
+    openmetrics.load_state(Database())
+    if "--daemon" in sys.argv:
+        run_daemon()
+    else:
+        run_cycle("cron")
+    sys.exit(0)
@@ -0,0 +1,130 @@
+"""
+Static, sharded inverted index over published mentions for in-browser search.
+
+Layout under docs/search/:
+- manifest.json             index version, last indexed mention id, partition count
+- shards/<p>/keys.json      shard keys present in partition p
+- shards/<p>/<key>.json     {token: [mention ids, ascending]} for ids p*PARTITION_SIZE..
+- docs/<n>.json             {id: [timestamp, source, url, snippet]} for ids n*DOC_CHUNK_SIZE..
+
+Postings are partitioned by mention id, and within a partition sharded by the
+first KEY_LENGTH characters of each token, so the browser only downloads the
+shards for the words actually typed. Ids only grow, so every partition but
+the newest is immutable: a publish rewrites just the newest partition's
+touched shards (and the newest doc chunk), never the whole history.
+"""
+
+import json
+import os
+import re
+import shutil
+
+INDEX_VERSION = 2
+DOC_CHUNK_SIZE = 1000
+PARTITION_SIZE = 5000
+KEY_LENGTH = 3
+SNIPPET_CHARS = 240
+BATCH_SIZE = 5000
+
+# Keep in sync with tokenize() in static/dashboard.js
+TOKEN_PATTERN = re.compile(r"[a-z0-9\u0600-\u06ff]{2,}")
+STOPWORDS = {
+    "the", "and", "for", "are", "was", "with", "that", "this", "from", "into",
+    "its", "has", "have", "not", "but", "will", "can", "all", "any", "our",
+    "of", "to", "in", "on", "at", "by", "or", "an", "as", "is", "it", "be",
+    # Every analysis carries these tags
+    "fact", "implication", "signal", "source", "https", "http", "www", "com",
+}
+
+
+def tokenize(text):
+    return {t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS}
+
+
+def shard_key(token):
+    # Same rule as shardKey() in static/dashboard.js
+    head = token[:KEY_LENGTH]
+    if head.isascii():
+        return head
+    return "u" + format(ord(token[0]), "x")
+
+
+def snippet(analysis):
+    text = re.sub(r"[*_#`]+", "", analysis or "")
+    text = re.sub(r"\s+", " ", text).strip()
+    return text[:SNIPPET_CHARS]
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    # Write-then-rename so a reader never sees a half-written shard
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def update_search_index(db, base_dir):
+    """
+    Index mentions added since the last run into base_dir (docs/search).
+    Returns the number of newly indexed mentions.
+    """
+    manifest_path = os.path.join(base_dir, "manifest.json")
+    manifest = _read_json(manifest_path, None)
+    if manifest is None or manifest.get("version") != INDEX_VERSION:
+        # Missing or incompatible index on disk: rebuild from scratch
+        manifest = {"version": INDEX_VERSION, "doc_chunk_size": DOC_CHUNK_SIZE, "partition_size": PARTITION_SIZE, "last_id": 0, "partitions": 0}
+        for sub in ("shards", "docs"):
+            shutil.rmtree(os.path.join(base_dir, sub), ignore_errors=True)
+    # The manifest on disk is the source of truth for what's already indexed
+    last_id = manifest["last_id"]
+
+    indexed = 0
+    while True:
+        rows = db.get_mentions_after(last_id, BATCH_SIZE)
+        if not rows:
+            break
+
+        postings = {}
+        chunks = {}
+        for mention_id, ts, source, analysis, url in rows:
+            partition = mention_id // PARTITION_SIZE
+            for token in tokenize(f"{analysis or ''} {source or ''}"):
+                postings.setdefault((partition, shard_key(token)), {}).setdefault(token, []).append(mention_id)
+            chunks.setdefault(mention_id // DOC_CHUNK_SIZE, {})[str(mention_id)] = [ts, source, url, snippet(analysis)]
+
+        # Merge into only the shards and doc chunks this batch touches
+        # (all in the newest partition, bar one boundary crossing)
+        new_keys = {}
+        for (partition, key), tokens in postings.items():
+            path = os.path.join(base_dir, "shards", str(partition), f"{key}.json")
+            shard = _read_json(path, {})
+            for token, ids in tokens.items():
+                shard.setdefault(token, []).extend(ids)
+            _write_json(path, shard)
+            new_keys.setdefault(partition, set()).add(key)
+        for partition, keys in new_keys.items():
+            path = os.path.join(base_dir, "shards", str(partition), "keys.json")
+            known = set(_read_json(path, []))
+            if not keys <= known:
+                _write_json(path, sorted(known | keys))
+        for chunk_no, docs in chunks.items():
+            path = os.path.join(base_dir, "docs", f"{chunk_no}.json")
+            chunk = _read_json(path, {})
+            chunk.update(docs)
+            _write_json(path, chunk)
+
+        last_id = rows[-1][0]
+        indexed += len(rows)
+
+    manifest["last_id"] = last_id
+    manifest["partitions"] = last_id // PARTITION_SIZE + 1 if last_id else 0
+    _write_json(manifest_path, manifest)
+    return indexed
@@ -7,29 +7,64 @@ Uses:
 
 import feedparser
 import requests
-import json
 import os
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from article import Article
 from database import Database
+from source_registry import SourceRegistry
+from http_util import conditional_get, get_session, record_http_error, save_feed_state
+import metrics
+
+# Nitter instances to try for X accounts, ordered at runtime by recorded health
+NITTER_INSTANCES = [
+    "nitter.net",
+    "nitter.privacydev.net",
+    "nitter.poast.org",
+    "nitter.unixfox.eu",
+    "nitter.projectsegfau.lt",
+    "nitter.it",
+    "nitter.moomoo.me",
+    "nitter.rawbit.ninja",
+    "nitter.ca",
+]
+# Instances probed concurrently per account, and the per-probe timeout (seconds)
+NITTER_PARALLEL = 3
+NITTER_TIMEOUT = 6
 
 
 class SocialFeeder:
-    def __init__(self, sources_path="/root/daily_brief/sources.json"):
+    def __init__(self, sources_path="/root/daily_brief/sources.json", sources=None):
         self.sources_path = sources_path
+        self.registry = SourceRegistry.get(sources_path)
+        self.sources = sources
         self.db = Database()
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        # source name -> feed validators, saved by commit_feed_state() once processed
+        self.pending_feed_state = {}
+        # Pooled, no retries: a slow instance should just lose the race
+        self.nitter_session = get_session("nitter", retries=0, pool_size=NITTER_PARALLEL * 2)
         
     def load_sources(self):
-        with open(self.sources_path, 'r') as f:
-            return json.load(f)
+        # A pinned per-pulse snapshot if given, else the registry's cached copy
+        if self.sources is not None:
+            return self.sources
+        return self.registry.load()
     
-    def fetch_reddit(self):
+    def commit_feed_state(self, skip=()):
+        # Same contract as Feeder.commit_feed_state (only Reddit uses conditional fetches)
+        for name, new_state in list(self.pending_feed_state.items()):
+            if name not in skip:
+                save_feed_state(self.db, new_state)
+        self.pending_feed_state.clear()
+
+    def iter_reddit(self):
         """
         Fetch posts from Reddit subreddits via RSS.
-        Returns list of article dicts.
+        Yields Articles (not yet deduplicated) subreddit by subreddit.
         """
         sources = self.load_sources()
-        articles = []
         
         for sub in sources.get("reddit", []):
             subreddit = sub['subreddit']
@@ -39,45 +74,42 @@ class SocialFeeder:
             rss_url = f"https://old.reddit.com/r/{subreddit}/.rss"
             
             try:
-                # Fetch with requests (proper User-Agent)
+                # Fetch with requests (proper User-Agent), skipping unchanged feeds
                 headers = {'User-Agent': self.user_agent}
-                response = requests.get(rss_url, headers=headers, timeout=15)
+                with metrics.timed(f"fetch:r/{subreddit}"):
+                    status, body, new_state = conditional_get(self.db, rss_url, headers=headers, timeout=15)
+                if new_state:
+                    self.pending_feed_state[f"r/{subreddit}"] = new_state
                 
-                if response.status_code != 200:
-                    print(f"Error fetching r/{subreddit}: HTTP {response.status_code}")
+                if status not in (200, 304):
+                    print(f"Error fetching r/{subreddit}: HTTP {status}")
+                    continue
+                if body is None:
                     continue
                 
                 # Parse the fetched RSS content
-                feed = feedparser.parse(response.text)
+                feed = feedparser.parse(body)
                 
                 for entry in feed.entries[:limit]:
                     title = entry.title
                     link = entry.link
                     
-                    # Extract summary from content if available
+                    # Extract summary from content if available (Article truncates it)
                     summary = ""
                     if hasattr(entry, 'content') and entry.content:
                         # Reddit RSS uses HTML in content
-                        summary = entry.content[0].get('value', '')[:500]
+                        summary = entry.content[0].get('value', '')
                     elif hasattr(entry, 'summary'):
-                        summary = entry.summary[:500]
+                        summary = entry.summary
                     
-                    title_hash = self.db.generate_hash(title)
-                    if not self.db.is_duplicate(title_hash):
-                        articles.append({
-                            "source": f"r/{subreddit}",
-                            "title": title,
-                            "link": link,
-                            "text": f"{title}\n{summary}",
-                            "hash": title_hash,
-                            "type": "reddit"
-                        })
+                    yield Article(f"r/{subreddit}", title, summary, link, self.db.generate_hash(title), type="reddit")
                         
             except Exception as e:
                 print(f"Error fetching r/{subreddit}: {e}")
                 continue
-                
-        return articles
+
+    def fetch_reddit(self):
+        return list(self.iter_reddit())
     
     def fetch_x_via_openclaw(self, handle):
         """
@@ -107,72 +139,124 @@ class SocialFeeder:
             print(f"Error fetching @{handle}: {e}")
             return None
     
-    def fetch_x_accounts(self):
+    def iter_x_accounts(self):
         """
-        Fetch content from X/Twitter accounts.
+        Fetch content from X/Twitter accounts, yielding posts account by account.
         Uses multiple strategies:
         1. Try Nitter instances (if available)
         2. Try web search for recent posts
         3. Fallback to nothing (log for manual review)
         """
         sources = self.load_sources()
-        articles = []
-        
-        # List of Nitter instances to try
-        nitter_instances = [
-            "nitter.net",
-            "nitter.privacydev.net",
-            "nitter.poast.org",
-            "nitter.unixfox.eu",
-            "nitter.projectsegfau.lt",
-            "nitter.it",
-            "nitter.moomoo.me",
-            "nitter.rawbit.ninja",
-            "nitter.ca",
-        ]
         
         for account in sources.get("x_accounts", []):
             handle = account['handle']
             name = account['name']
             
             # Try Nitter RSS first
-            fetched = False
-            for instance in nitter_instances:
-                try:
-                    rss_url = f"https://{instance}/{handle}/rss"
-                    feed = feedparser.parse(
-                        rss_url,
-                        request_headers={'User-Agent': self.user_agent}
-                    )
-                    
-                    if feed.entries:
-                        for entry in feed.entries[:5]:
-                            title = entry.title[:200] if entry.title else f"Post by @{handle}"
-                            link = entry.link
-                            summary = getattr(entry, 'description', '')[:500]
-                            
-                            title_hash = self.db.generate_hash(title + link)
-                            if not self.db.is_duplicate(title_hash):
-                                articles.append({
-                                    "source": f"@{handle}",
-                                    "title": title,
-                                    "link": link,
-                                    "text": f"@{handle}: {title}\n{summary}",
-                                    "hash": title_hash,
-                                    "type": "twitter"
-                                })
-                        fetched = True
-                        break
-                        
-                except Exception:
-                    continue
-            
-            if not fetched:
+            with metrics.timed(f"fetch:@{handle}"):
+                feed = self._fetch_nitter_feed(handle)
+            if feed is None:
                 # Log that we couldn't fetch this account
                 print(f"Could not fetch @{handle} from any Nitter instance")
+                continue
+
+            for entry in feed.entries[:5]:
+                title = entry.title[:200] if entry.title else f"Post by @{handle}"
+                link = entry.link
+                summary = getattr(entry, 'description', '')
                 
-        return articles
+                yield Article(f"@{handle}", title, summary, link, self.db.generate_hash(title + link), type="twitter")
+
+    def fetch_x_accounts(self):
+        return list(self.iter_x_accounts())
+
+    def _ordered_nitter_instances(self):
+        """
+        Instances ordered by health: those in backoff are skipped, the rest
+        sorted by smoothed success rate, then average latency. If every
+        instance is backing off, the ones closest to recovery are tried.
+        """
+        health = self.db.get_nitter_health()
+        now = time.time()
+
+        def score(instance):
+            h = health.get(instance)
+            if not h:
+                # Unknown instances rank like a 50% success rate
+                return (-0.5, float('inf'))
+            success_rate = (h['successes'] + 1) / (h['successes'] + h['failures'] + 2)
+            return (-success_rate, h['avg_latency'] if h['avg_latency'] is not None else float('inf'))
+
+        available = [i for i in NITTER_INSTANCES if (health.get(i) or {}).get('backoff_until', 0) <= now]
+        if not available:
+            return sorted(NITTER_INSTANCES, key=lambda i: health[i]['backoff_until'])[:NITTER_PARALLEL]
+        return sorted(available, key=score)
+
+    def _probe_nitter(self, instance, handle):
+        """
+        Fetch one account's RSS from one instance.
+        Returns (outcome, feed): "ok" with the parsed feed; "miss" when the
+        instance answered properly but has nothing for this account (a 404
+        for a suspended or misspelled handle, or a well-formed empty feed);
+        "fail" for everything else: transport errors, any other 4xx (429,
+        401/403/410 from dead or blocked instances), 5xx and non-feed pages.
+        Only "ok" and "fail" count towards the instance's health.
+        """
+        start = time.monotonic()
+        outcome, feed = "fail", None
+        try:
+            response = self.nitter_session.get(
+                f"https://{instance}/{handle}/rss",
+                headers={'User-Agent': self.user_agent},
+                timeout=NITTER_TIMEOUT
+            )
+            status = response.status_code
+            if status == 200:
+                parsed = feedparser.parse(response.content)
+                if parsed.entries:
+                    outcome, feed = "ok", parsed
+                elif parsed.version:
+                    outcome = "miss"
+                # else: dead instances often answer 200 with an HTML error page
+            elif status == 404:
+                outcome = "miss"
+            # 401/403/410 and friends: usually a dead or Cloudflare-blocked instance
+        except Exception:
+            pass
+        if outcome == "fail":
+            record_http_error(f"https://{instance}/")
+        if outcome != "miss":
+            self.db.record_nitter_result(instance, outcome == "ok", time.monotonic() - start)
+        return outcome, feed
+
+    def _fetch_nitter_feed(self, handle):
+        """
+        Probe the healthiest instances NITTER_PARALLEL at a time and take the
+        first good response; stragglers finish in the background and only
+        update health stats.
+        """
+        instances = self._ordered_nitter_instances()
+        for i in range(0, len(instances), NITTER_PARALLEL):
+            batch = instances[i:i + NITTER_PARALLEL]
+            pool = ThreadPoolExecutor(max_workers=len(batch))
+            try:
+                futures = [pool.submit(self._probe_nitter, instance, handle) for instance in batch]
+                for future in as_completed(futures):
+                    outcome, feed = future.result()
+                    if outcome == "ok":
+                        return feed
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        return None
     
+    def iter_all(self):
+        """
+        Stream all social media content: Reddit first, then X/Twitter.
+        """
+        yield from self.iter_reddit()
+        yield from self.iter_x_accounts()
+
     def fetch_all(self):
         """
         Fetch all social media content.
@@ -199,6 +283,6 @@ if __name__ == "__main__":
     
     print(f"\n=== Total: {len(articles)} articles ===\n")
     for i, article in enumerate(articles[:10]):
-        print(f"{i+1}. [{article['source']}] {article['title'][:80]}...")
-        print(f"   Link: {article['link']}")
+        print(f"{i+1}. [{article.source}] {article.title[:80]}...")
+        print(f"   Link: {article.link}")
         print()
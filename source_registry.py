@@ -0,0 +1,102 @@
+"""
+Source registry - the single reader/writer of sources.json.
+
+Writes go to a temp file in the same directory and are swapped in with
+os.replace under an exclusive lock, so a reader (the pulse) only ever sees a
+complete file. Every save bumps a top-level "version" stamp. Reads are cached
+and only re-parsed when the file's mtime/size changes.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+class SourceRegistry:
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path="/root/daily_brief/sources.json"):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._cache = None
+        self._cache_key = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, path="/root/daily_brief/sources.json"):
+        # Shared per path, so Feeder, SocialFeeder and the pipeline parse the file once
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    @contextmanager
+    def _file_lock(self):
+        # Cross-process writer lock (dashboard edits vs. other editors)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def load(self):
+        """
+        Current sources dict. Re-parsed only when the file changed on disk;
+        if it can't be parsed, the last good copy is returned instead.
+        """
+        with self._lock:
+            stat = os.stat(self.path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            if self._cache is None or key != self._cache_key:
+                try:
+                    self._cache = self._read()
+                    self._cache_key = key
+                except ValueError as e:
+                    if self._cache is None:
+                        raise
+                    print(f"Error parsing {self.path}, keeping last good sources: {e}")
+            return self._cache
+
+    def save(self, sources):
+        with self._file_lock():
+            self._write(sources)
+
+    def update(self, mutate):
+        """
+        Atomic read-modify-write: re-reads the file under the lock, applies
+        mutate(sources) and saves, so concurrent editors don't clobber each other.
+        """
+        with self._file_lock():
+            sources = self._read()
+            mutate(sources)
+            self._write(sources)
+            return sources
+
+    def _write(self, sources):
+        # Caller holds the file lock
+        sources = dict(sources)
+        sources["version"] = int(sources.get("version", 0)) + 1
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".sources.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(sources, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600; keep the original file's permissions
+            if os.path.exists(self.path):
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,151 @@
+function copyText(btn, text) {
+    navigator.clipboard.writeText(text).then(() => {
+        const original = btn.innerText;
+        btn.innerText = 'COPIED!';
+        btn.style.color = '#00ff00';
+        setTimeout(() => {
+            btn.innerText = original;
+            btn.style.color = '#888';
+        }, 2000);
+    });
+}
+
+function toggleLanguage() {
+    // Both briefs and the shared recon log live in one card; body.rtl picks the language
+    const btn = document.getElementById('lang-btn');
+    const header = document.querySelector('header');
+
+    if (!document.body.classList.contains('rtl')) {
+        // Switch to Arabic
+        btn.innerText = 'SWITCH TO ENGLISH';
+        document.body.classList.add('rtl');
+        header.classList.add('rtl');
+    } else {
+        // Switch to English
+        btn.innerText = 'النسخة العربية (ARABIC)';
+        document.body.classList.remove('rtl');
+        header.classList.remove('rtl');
+    }
+}
+
+// Archive search over the static index in docs/search (built by search_index.py).
+// Keep tokenize()/shardKey() in sync with the Python side.
+const SEARCH_STOPWORDS = new Set([
+    'the', 'and', 'for', 'are', 'was', 'with', 'that', 'this', 'from', 'into',
+    'its', 'has', 'have', 'not', 'but', 'will', 'can', 'all', 'any', 'our',
+    'of', 'to', 'in', 'on', 'at', 'by', 'or', 'an', 'as', 'is', 'it', 'be',
+    'fact', 'implication', 'signal', 'source', 'https', 'http', 'www', 'com'
+]);
+const SEARCH_MAX_RESULTS = 20;
+const SEARCH_KEY_LENGTH = 3;
+const searchCache = {};
+
+function tokenize(text) {
+    const tokens = text.toLowerCase().match(/[a-z0-9\u0600-\u06ff]{2,}/g) || [];
+    return [...new Set(tokens.filter(t => !SEARCH_STOPWORDS.has(t)))];
+}
+
+function shardKey(token) {
+    const head = token.slice(0, SEARCH_KEY_LENGTH);
+    if (/^[\x00-\x7f]*$/.test(head)) {
+        return head;
+    }
+    return 'u' + token.charCodeAt(0).toString(16);
+}
+
+function fetchSearchJson(base, path) {
+    // Shards and doc chunks are fetched lazily, once per page view
+    if (!searchCache[path]) {
+        searchCache[path] = fetch(base + path).then(r => r.ok ? r.json() : null).catch(() => null);
+    }
+    return searchCache[path];
+}
+
+function escapeHtml(text) {
+    const entities = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+    return (text == null ? '' : String(text)).replace(/[&<>"']/g, c => entities[c]);
+}
+
+async function runSearch(event) {
+    event.preventDefault();
+    const form = event.target;
+    const base = form.dataset.base;
+    const results = document.getElementById('search-results');
+    const tokens = tokenize(document.getElementById('search-input').value);
+    if (!tokens.length) {
+        results.hidden = true;
+        return;
+    }
+
+    const manifest = await fetchSearchJson(base, 'manifest.json');
+    if (!manifest) {
+        results.hidden = false;
+        results.innerHTML = '<div class="empty-state">Search index unavailable.</div>';
+        return;
+    }
+
+    // Shard keys per id partition; all but the newest partition never change
+    const partitions = [...Array(manifest.partitions).keys()];
+    const partitionKeys = await Promise.all(partitions.map(p => fetchSearchJson(base, 'shards/' + p + '/keys.json')));
+
+    // Every query word must match (as a prefix) some indexed token
+    let matched = null;
+    for (const token of tokens) {
+        const key = shardKey(token);
+        // Short query words can match several (longer) shard keys
+        const paths = [];
+        partitions.forEach(p => (partitionKeys[p] || []).forEach(k => {
+            if (k === key || k.startsWith(token)) {
+                paths.push('shards/' + p + '/' + k + '.json');
+            }
+        }));
+        const shards = await Promise.all(paths.map(path => fetchSearchJson(base, path)));
+        const ids = new Set();
+        for (const shard of shards) {
+            for (const [word, postings] of Object.entries(shard || {})) {
+                if (word.startsWith(token)) {
+                    postings.forEach(id => ids.add(id));
+                }
+            }
+        }
+        matched = matched === null ? ids : new Set([...matched].filter(id => ids.has(id)));
+        if (!matched.size) {
+            break;
+        }
+    }
+
+    const top = [...matched].sort((a, b) => b - a).slice(0, SEARCH_MAX_RESULTS);
+    const cards = [];
+    for (const id of top) {
+        const chunk = await fetchSearchJson(base, 'docs/' + Math.floor(id / manifest.doc_chunk_size) + '.json');
+        const doc = chunk && chunk[String(id)];
+        if (!doc) {
+            continue;
+        }
+        const [ts, source, url, snippet] = doc;
+        const link = url ? ' <a href="' + escapeHtml(url) + '" target="_blank" class="source-link">ORIGIN</a>' : '';
+        cards.push(
+            '<div class="intel-pulse"><div class="intel-header"><div class="header-meta-group">' +
+            '<span class="pulse-ts">' + escapeHtml(ts) + '</span>' +
+            '<span class="pulse-source">REF: ' + escapeHtml(source) + '</span></div>' + link + '</div>' +
+            '<div class="intel-content dossier-style">' + escapeHtml(snippet) + '</div></div>'
+        );
+    }
+    results.hidden = false;
+    results.innerHTML = cards.length ? cards.join('') : '<div class="empty-state">No matching intel.</div>';
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    // Add copy buttons ONLY to Commander Output list items
+    document.querySelectorAll('.commander-output li').forEach(li => {
+        const btn = document.createElement('button');
+        btn.className = 'copy-btn';
+        btn.innerText = 'COPY';
+        const cleanText = li.innerText.replace('COPIED!', '').replace('COPY', '').trim();
+        btn.onclick = (e) => {
+            e.stopPropagation();
+            copyText(btn, cleanText);
+        };
+        li.appendChild(btn);
+    });
+});